@@ -1,16 +1,28 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional
 
 from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, StateGraph
 
 from pipeline import Pipeline, PipelineStatus
+from pipeline.execution import execute_with_policy
 from pipeline.models import Flow
-from pipeline.models import Edge
+from pipeline.models import Edge, Node
+from graph.planner import plan_flow
 
 
 def build_langgraph_from_flow(
-    flow: Flow, pipeline: Pipeline
+    flow: Flow,
+    pipeline: Pipeline,
+    requested_outputs: Optional[Iterable[str]] = None,
 ) -> StateGraph:
+    if requested_outputs is None:
+        requested_outputs = pipeline.requested_outputs
+    plan = plan_flow(flow, requested_outputs, pipeline.user_inputs)
+    node_map = {node.id: node for node in flow.nodes}
+    # Inputs are always resolved through the original edges: merged nodes
+    # publish their outputs under their own ids as well.
+    edges = flow.edges
+    flow = plan.flow
     builder = StateGraph()
 
     def get_input_for_node(
@@ -24,48 +36,109 @@ def build_langgraph_from_flow(
 
         return pipeline.user_inputs.get(f"{node_id}.{param_name}")
 
+    def run_node(n: Node, state: Dict[str, Any], attempts: list):
+        inputs = {
+            param.name: get_input_for_node(n.id, param.name, state, edges)
+            for param in n.inputs
+        }
+        result = execute_with_policy(
+            lambda: n.function.implementation(**inputs),
+            n.policy or n.function.policy,
+            f"{n.id}:{n.function.name}",
+            attempts,
+        )
+        outputs = {}
+        if isinstance(result, dict):
+            for k, v in result.items():
+                outputs[f"{n.id}.{k}"] = v
+        return inputs, result, outputs
+
+    terminal_nodes = set(n.id for n in flow.nodes) - set(
+        e.from_node for e in flow.edges
+    )
+
+    def finish_if_complete():
+        if all(
+            pipeline.executed_nodes.get(tid, {}).get("status")
+            == PipelineStatus.SUCCESS
+            for tid in terminal_nodes
+        ):
+            pipeline.finish(PipelineStatus.SUCCESS)
+
     for node in flow.nodes:
         def make_step(n):
             def step_fn(state: Dict[str, Any]) -> Dict[str, Any]:
-                pipeline.update_node_status(n.id, PipelineStatus.RUNNING)
+                aliases = plan.aliases_of(n.id)
+                pending = [n.id, *aliases]
+                for node_id in pending:
+                    pipeline.update_node_status(node_id, PipelineStatus.RUNNING)
+                attempts = []
                 try:
                     if not n.inputs and not n.outputs:
-                        n.function.implementation(pipeline)
-                        pipeline.update_node_status(n.id, PipelineStatus.SUCCESS)
-                        return state
-
-                    inputs = {
-                        param.name: get_input_for_node(
-                            n.id, param.name, state, flow.edges
+                        execute_with_policy(
+                            lambda: n.function.implementation(pipeline),
+                            n.policy or n.function.policy,
+                            f"{n.id}:{n.function.name}",
+                            attempts,
+                        )
+                        pipeline.update_node_status(
+                            n.id, PipelineStatus.SUCCESS, attempts=attempts
                         )
-                        for param in n.inputs
-                    }
-                    result = n.function.implementation(**inputs)
-                    outputs = {}
-                    if isinstance(result, dict):
-                        for k, v in result.items():
-                            outputs[f"{n.id}.{k}"] = v
+                        finish_if_complete()
+                        return state
 
+                    inputs, result, outputs = run_node(n, state, attempts)
+                    canonical_attempts = attempts
                     pipeline.update_node_status(
-                        n.id, PipelineStatus.SUCCESS, inputs, outputs
+                        n.id, PipelineStatus.SUCCESS, inputs, outputs,
+                        attempts=canonical_attempts,
                     )
-                    return {**state, **outputs}
+                    pending.remove(n.id)
+                    published = dict(outputs)
+                    for alias in aliases:
+                        if plan.merge_holds(alias, pipeline.user_inputs):
+                            alias_inputs = inputs
+                            alias_outputs = {}
+                            if isinstance(result, dict):
+                                for k, v in result.items():
+                                    alias_outputs[f"{alias}.{k}"] = v
+                            pipeline.update_node_status(
+                                alias, PipelineStatus.SUCCESS, alias_inputs,
+                                alias_outputs, attempts=canonical_attempts,
+                            )
+                        else:
+                            # A user input the merge relied on changed after
+                            # planning, so the merged node runs on its own.
+                            attempts = []
+                            alias_inputs, _, alias_outputs = run_node(
+                                node_map[alias], {**state, **published}, attempts
+                            )
+                            pipeline.update_node_status(
+                                alias, PipelineStatus.SUCCESS, alias_inputs,
+                                alias_outputs, attempts=attempts,
+                            )
+                        pending.remove(alias)
+                        published.update(alias_outputs)
+                    finish_if_complete()
+                    return {**state, **published}
                 except Exception as e:
-                    pipeline.update_node_status(
-                        n.id, PipelineStatus.FAILED, error=str(e)
-                    )
+                    for node_id in pending:
+                        pipeline.update_node_status(
+                            node_id, PipelineStatus.FAILED, error=str(e),
+                            attempts=attempts,
+                        )
+                    pipeline.finish(PipelineStatus.FAILED)
                     raise
 
             return step_fn
 
         builder.add_node(node.id, RunnableLambda(make_step(node)))
 
-    for edge in flow.edges:
-        builder.add_edge(edge.from_node, edge.to_node)
+    for from_node, to_node in dict.fromkeys(
+        (e.from_node, e.to_node) for e in flow.edges
+    ):
+        builder.add_edge(from_node, to_node)
 
-    terminal_nodes = set(n.id for n in flow.nodes) - set(
-        e.from_node for e in flow.edges
-    )
     for tid in terminal_nodes:
         builder.add_edge(tid, END)
 
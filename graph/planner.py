@@ -0,0 +1,180 @@
+from typing import Dict, Any, Hashable, Iterable, Optional
+
+from pydantic import BaseModel
+
+from pipeline.models import Flow
+from pipeline.models import Edge, Node
+
+
+class ExecutionPlan(BaseModel):
+    """Reduced flow that only executes what the requested outputs depend on.
+
+    ``aliases`` maps every merged duplicate node id to the id of the
+    canonical node that executes on its behalf. ``merge_inputs`` keeps, per
+    merged node, the frozen user-input values the merge was proven with.
+    """
+    flow: Flow
+    aliases: Dict[str, str] = {}
+    merge_inputs: Dict[str, Dict[str, Any]] = {}
+
+    def aliases_of(self, node_id: str) -> list[str]:
+        return [
+            alias for alias, canonical in self.aliases.items()
+            if canonical == node_id
+        ]
+
+    def merge_holds(self, alias: str, user_inputs: Dict[str, Any]) -> bool:
+        """Whether the user inputs still match those seen at planning time.
+
+        User inputs can be injected again between planning and execution;
+        when one the merge relied on changed, the alias must run on its own.
+        """
+        return all(
+            key in user_inputs and _freeze(user_inputs[key]) == frozen
+            for key, frozen in self.merge_inputs.get(alias, {}).items()
+        )
+
+
+def _freeze(value: Any) -> Optional[Hashable]:
+    if isinstance(value, BaseModel):
+        return _freeze(value.model_dump())
+    if isinstance(value, dict):
+        items = [(k, _freeze(v)) for k, v in value.items()]
+        if any(v is None for _, v in items):
+            return None
+        return ("dict", tuple(sorted(items, key=lambda kv: repr(kv[0]))))
+    if isinstance(value, (list, tuple)):
+        frozen = [_freeze(v) for v in value]
+        if any(f is None for f in frozen):
+            return None
+        return (type(value).__name__, tuple(frozen))
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return (type(value).__name__, value)
+
+
+def _node_signature(
+    node: Node,
+    edges: list[Edge],
+    aliases: Dict[str, str],
+    merge_inputs: Dict[str, Dict[str, Any]],
+    user_inputs: Dict[str, Any],
+) -> tuple[Optional[Hashable], Dict[str, Any]]:
+    """Return the node's signature and the user inputs it depends on.
+
+    The dependencies cover the node's own user inputs plus those of every
+    merge its sources went through.
+    """
+    # Nodes without declared inputs/outputs run for their side effects on
+    # the pipeline and are never considered interchangeable.
+    if not node.inputs and not node.outputs:
+        return None, {}
+
+    bindings = []
+    relied_on: Dict[str, Any] = {}
+    for param in node.inputs:
+        edge = next(
+            (e for e in edges
+             if e.to_node == node.id and e.to_input == param.name),
+            None,
+        )
+        if edge is not None:
+            transformation = _freeze(edge.transformation)
+            if transformation is None:
+                return None, {}
+            relied_on.update(merge_inputs.get(edge.from_node, {}))
+            source = (
+                "edge",
+                aliases.get(edge.from_node, edge.from_node),
+                edge.from_output,
+                transformation,
+            )
+        else:
+            # Inputs may still be injected after planning; only values that
+            # are already known can prove two nodes identical.
+            key = f"{node.id}.{param.name}"
+            if key not in user_inputs:
+                return None, {}
+            frozen = _freeze(user_inputs[key])
+            if frozen is None:
+                return None, {}
+            relied_on[key] = frozen
+            source = ("user", frozen)
+        bindings.append((param.name, source))
+
+    signature = (
+        node.function.name,
+        id(node.function.implementation),
+        tuple(sorted(bindings)),
+    )
+    return signature, relied_on
+
+
+def plan_flow(
+    flow: Flow,
+    requested_outputs: Optional[Iterable[str]] = None,
+    user_inputs: Optional[Dict[str, Any]] = None,
+) -> ExecutionPlan:
+    """Prune and deduplicate ``flow`` for the given ``node_id.output`` keys.
+
+    Nodes that none of the requested outputs depend on are dropped, and
+    nodes running the same function over the same bound inputs are merged
+    into a single canonical node. When ``requested_outputs`` is omitted,
+    every node is kept and only deduplication is applied.
+    """
+    user_inputs = user_inputs or {}
+    if requested_outputs is None:
+        required = {node.id for node in flow.nodes}
+    else:
+        required = flow.get_required_nodes(requested_outputs)
+
+    node_map = {node.id: node for node in flow.nodes}
+    edges = [
+        e for e in flow.edges
+        if e.from_node in required and e.to_node in required
+    ]
+
+    aliases: Dict[str, str] = {}
+    merge_inputs: Dict[str, Dict[str, Any]] = {}
+    relied_on: Dict[str, Dict[str, Any]] = {}
+    canonical_by_signature: Dict[Hashable, str] = {}
+    for node_id in flow.get_execution_order():
+        if node_id not in required:
+            continue
+        signature, relied_on[node_id] = _node_signature(
+            node_map[node_id], edges, aliases, merge_inputs, user_inputs
+        )
+        if signature is None:
+            continue
+        if signature in canonical_by_signature:
+            canonical = canonical_by_signature[signature]
+            aliases[node_id] = canonical
+            merge_inputs[node_id] = {
+                **relied_on[canonical], **relied_on[node_id]
+            }
+        else:
+            canonical_by_signature[signature] = node_id
+
+    planned_edges = []
+    seen_edges = set()
+    for edge in edges:
+        if edge.to_node in aliases:
+            continue
+        from_node = aliases.get(edge.from_node, edge.from_node)
+        key = (from_node, edge.from_output, edge.to_node, edge.to_input)
+        if key in seen_edges:
+            continue
+        seen_edges.add(key)
+        planned_edges.append(edge.model_copy(update={"from_node": from_node}))
+
+    planned_nodes = [
+        node for node in flow.nodes
+        if node.id in required and node.id not in aliases
+    ]
+    return ExecutionPlan(
+        flow=Flow(nodes=planned_nodes, edges=planned_edges),
+        aliases=aliases,
+        merge_inputs=merge_inputs,
+    )
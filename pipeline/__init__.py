@@ -1,10 +1,12 @@
+import asyncio
+import json
+import threading
 from datetime import datetime
 from enum import StrEnum
-from typing import Dict, Any, Optional, Callable, List, Self
+from typing import Dict, Any, Optional, Callable, List, Self, AsyncIterator
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
-from poc import Parameter
 from pipeline.models.flow import Flow
 from pipeline.models.nodes import Edge
 
@@ -36,22 +38,80 @@ class PipelineStatus(StrEnum):
         return self == PipelineStatus.SUCCESS
 
 
+class _ChangeSubscribers:
+    """Event loops waiting on a pipeline's change feed.
+
+    Changes are recorded from the thread running the graph while
+    subscribers come and go on their event loop, so every access is
+    guarded by ``lock``. Copies of a pipeline never share subscribers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._entries: List[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    def add(self, entry: tuple[asyncio.AbstractEventLoop, asyncio.Event]):
+        with self.lock:
+            self._entries.append(entry)
+
+    def discard(self, entry: tuple[asyncio.AbstractEventLoop, asyncio.Event]):
+        with self.lock:
+            if entry in self._entries:
+                self._entries.remove(entry)
+
+    def notify(self):
+        with self.lock:
+            entries = list(self._entries)
+        for entry in entries:
+            loop, event = entry
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The subscriber's loop is closed.
+                self.discard(entry)
+
+    def __copy__(self):
+        return _ChangeSubscribers()
+
+    def __deepcopy__(self, memo):
+        return _ChangeSubscribers()
+
+
 class Pipeline(BaseModel):
     id: str
     flow: Flow
     started_at: datetime
     executed_nodes: Dict[str, Any] = {}
     user_inputs: Dict[str, Any] = {}
+    requested_outputs: Optional[List[str]] = None
     state: PipelineState = Field(default_factory=PipelineState)
     status: PipelineStatus = PipelineStatus.INITIALIZED
     persist_callback: Optional[Callable[[Self], None]] = None
+    version: int = 0
+    section_versions: Dict[str, int] = {}
+    node_versions: Dict[str, int] = {}
+    _subscribers: _ChangeSubscribers = PrivateAttr(
+        default_factory=_ChangeSubscribers
+    )
+
+    def __copy__(self):
+        copied = super().__copy__()
+        copied._subscribers = _ChangeSubscribers()
+        return copied
 
     def get_required_inputs(self) -> List[str]:
         provided_inputs = {
             (e.to_node, e.to_input) for e in self.flow.edges
         }
+        required_nodes = (
+            {node.id for node in self.flow.nodes}
+            if self.requested_outputs is None
+            else self.flow.get_required_nodes(self.requested_outputs)
+        )
         required_inputs = []
         for node in self.flow.nodes:
+            if node.id not in required_nodes:
+                continue
             for param in node.inputs:
                 if (node.id, param.name) not in provided_inputs:
                     required_inputs.append(f"{node.id}.{param.name}")
@@ -64,6 +124,7 @@ class Pipeline(BaseModel):
         inputs: Optional[dict] = None,
         outputs: Optional[dict] = None,
         error: Optional[str] = None,
+        attempts: Optional[List[Dict[str, Any]]] = None,
     ):
         now = datetime.utcnow()
         self.executed_nodes[node_id] = {
@@ -71,6 +132,7 @@ class Pipeline(BaseModel):
             "input_values": inputs or {},
             "output_values": outputs or {},
             "error_message": error,
+            "attempts": attempts or [],
             "started_at": (
                 now
                 if status.is_running()
@@ -78,16 +140,29 @@ class Pipeline(BaseModel):
             ),
             "finished_at": now if status.has_terminated() else None,
         }
+        self._record_change("nodes", node_id)
         if self.persist_callback:
             self.persist_callback(self)
 
     def pause(self):
         self.status = PipelineStatus.PAUSED
+        self._record_change("status")
         if self.persist_callback:
             self.persist_callback(self)
 
     def resume(self):
         self.status = PipelineStatus.RUNNING
+        self._record_change("status")
+        if self.persist_callback:
+            self.persist_callback(self)
+
+    def finish(self, status: PipelineStatus):
+        if not status.has_terminated():
+            raise ValueError(f"Status '{status}' não é um status final")
+        if self.status.has_terminated():
+            return
+        self.status = status
+        self._record_change("status")
         if self.persist_callback:
             self.persist_callback(self)
 
@@ -96,12 +171,79 @@ class Pipeline(BaseModel):
             "id": self.id,
             "status": self.status,
             "started_at": self.started_at.isoformat(),
+            "version": self.version,
             "executed_nodes": self.executed_nodes,
-            "required_user_inputs": self.identify_required_inputs(),
-            "state": self.state.dict(),
+            "required_user_inputs": self.get_required_inputs(),
+            "state": self.state.model_dump(),
+        }
+
+    def _record_change(self, section: str, node_id: Optional[str] = None):
+        with self._subscribers.lock:
+            self.version += 1
+            self.section_versions[section] = self.version
+            if node_id is not None:
+                self.node_versions[node_id] = self.version
+        self._subscribers.notify()
+
+    def export_changes(self, since_version: int = 0) -> Dict[str, Any]:
+        """Return only what changed after ``since_version``.
+
+        The returned ``version`` is the value to pass on the next call.
+        """
+        with self._subscribers.lock:
+            version = self.version
+            section_versions = dict(self.section_versions)
+            node_versions = dict(self.node_versions)
+        changes = {
+            "id": self.id,
+            "version": version,
+            "executed_nodes": {
+                node_id: self.executed_nodes[node_id]
+                for node_id, node_version in node_versions.items()
+                if node_version > since_version
+            },
         }
+        if section_versions.get("status", 0) > since_version:
+            changes["status"] = self.status
+        if section_versions.get("user_inputs", 0) > since_version:
+            changes["user_inputs"] = dict(self.user_inputs)
+            changes["required_user_inputs"] = self.get_required_inputs()
+        return changes
+
+    async def subscribe(
+        self, since_version: int = 0
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield ``export_changes`` diffs as soon as the pipeline changes.
+
+        Iteration stops once the pipeline has finished (see ``finish``).
+        """
+        subscriber = (asyncio.get_running_loop(), asyncio.Event())
+        self._subscribers.add(subscriber)
+        try:
+            while True:
+                subscriber[1].clear()
+                if self.version > since_version:
+                    changes = self.export_changes(since_version)
+                    since_version = changes["version"]
+                    yield changes
+                if self.status.has_terminated():
+                    return
+                await subscriber[1].wait()
+        finally:
+            self._subscribers.discard(subscriber)
+
+    async def subscribe_sse(self, since_version: int = 0) -> AsyncIterator[str]:
+        """Same as ``subscribe`` but framed as server-sent events.
+
+        The event ``id`` is the version, so a reconnecting client's
+        ``Last-Event-ID`` can be passed back as ``since_version``.
+        """
+        async for changes in self.subscribe(since_version):
+            data = json.dumps(changes, default=str)
+            yield f"id: {changes['version']}\nevent: changes\ndata: {data}\n\n"
 
     def inject_user_input(self, key: str, value: Any):
         self.user_inputs[key] = value
+        self._record_change("user_inputs")
         if self.persist_callback:
             self.persist_callback(self)
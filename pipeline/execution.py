@@ -0,0 +1,193 @@
+import math
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from pipeline.models.policies import ExecutionPolicy
+
+
+class LatencyTracker:
+    """Recent successful call durations per function, used to time hedges."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, key: str, duration: float) -> None:
+        with self._lock:
+            self._samples[key].append(duration)
+
+    def quantile(self, key: str, q: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(q * len(samples)) - 1)]
+
+
+latency_tracker = LatencyTracker()
+
+
+def _timed(call: Callable[[], Any]) -> tuple[bool, Any, float]:
+    started = time.monotonic()
+    try:
+        return True, call(), time.monotonic() - started
+    except Exception as e:
+        return False, e, time.monotonic() - started
+
+
+def _submit(call: Callable[[], Any]) -> Future:
+    # A daemon thread rather than a ThreadPoolExecutor: a call that never
+    # returns is abandoned and must not keep the interpreter from exiting.
+    future = Future()
+
+    def run():
+        future.set_result(_timed(call))
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _new_attempt(attempt: int, hedged: bool) -> Dict[str, Any]:
+    return {
+        "attempt": attempt,
+        "hedged": hedged,
+        "started_at": datetime.utcnow(),
+        "status": "running",
+        "duration_seconds": None,
+        "error": None,
+    }
+
+
+def _run_attempt(
+    call: Callable[[], Any],
+    policy: ExecutionPolicy,
+    key: str,
+    attempt: int,
+    timeout: Optional[float],
+    attempts: List[Dict[str, Any]],
+) -> Any:
+    hedge_delay = None
+    if policy.hedge:
+        hedge_delay = latency_tracker.quantile(
+            key, policy.hedge_quantile, policy.hedge_min_samples
+        )
+        if hedge_delay is None:
+            hedge_delay = policy.hedge_delay_seconds
+
+    started = time.monotonic()
+    end = started + timeout if timeout is not None else None
+    launched: List[tuple[Future, Dict[str, Any]]] = []
+
+    def launch(hedged: bool):
+        record = _new_attempt(attempt, hedged)
+        attempts.append(record)
+        launched.append((_submit(call), record))
+
+    def remaining(until: Optional[float]) -> Optional[float]:
+        return None if until is None else max(0.0, until - time.monotonic())
+
+    try:
+        launch(hedged=False)
+        failure: Optional[Exception] = None
+        while True:
+            pending = [f for f, r in launched if r["status"] == "running"]
+            hedge_at = None
+            if hedge_delay is not None and len(launched) == 1:
+                hedge_at = started + hedge_delay
+            until = min((t for t in (end, hedge_at) if t is not None), default=None)
+            if pending:
+                done, _ = wait(pending, remaining(until), FIRST_COMPLETED)
+            else:
+                done = set()
+
+            for future, record in launched:
+                if future not in done:
+                    continue
+                ok, value, duration = future.result()
+                record["duration_seconds"] = duration
+                if ok:
+                    record["status"] = "success"
+                    latency_tracker.record(key, duration)
+                    return value
+                record["status"] = "failed"
+                record["error"] = str(value)
+                failure = value
+
+            if hedge_at is not None and time.monotonic() >= hedge_at and (
+                end is None or time.monotonic() < end
+            ):
+                launch(hedged=True)
+                continue
+            if not any(r["status"] == "running" for _, r in launched):
+                raise failure
+            if end is not None and time.monotonic() >= end:
+                for _, record in launched:
+                    if record["status"] == "running":
+                        record["status"] = "timeout"
+                raise TimeoutError(f"Tentativa {attempt} excedeu {timeout:.2f}s")
+    finally:
+        # Calls still running lost the race against a hedge; their threads
+        # cannot be interrupted and are left to finish in the background.
+        for _, record in launched:
+            if record["status"] == "running":
+                record["status"] = "abandoned"
+
+
+def execute_with_policy(
+    call: Callable[[], Any],
+    policy: Optional[ExecutionPolicy] = None,
+    key: str = "",
+    attempts: Optional[List[Dict[str, Any]]] = None,
+) -> Any:
+    """
+    Run ``call`` under ``policy``: per-attempt timeout and overall deadline,
+    retries with jittered exponential backoff for transient errors, and an
+    optional hedged duplicate launched after the ``hedge_quantile`` latency
+    recorded for ``key``. Latencies are only comparable for the same work,
+    so the graph builder keys them by node id and function name.
+
+    Every launched call is appended to ``attempts``.
+    """
+    policy = policy or ExecutionPolicy()
+    attempts = attempts if attempts is not None else []
+    deadline = None
+    if policy.deadline_seconds is not None:
+        deadline = time.monotonic() + policy.deadline_seconds
+
+    attempt = 0
+    while True:
+        attempt += 1
+        timeout = policy.attempt_timeout_seconds
+        if deadline is not None:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise TimeoutError(f"Prazo de {policy.deadline_seconds}s excedido")
+            timeout = left if timeout is None else min(timeout, left)
+        if timeout is None and not policy.hedge:
+            # Nothing to supervise: run inline without a helper thread.
+            record = _new_attempt(attempt, hedged=False)
+            attempts.append(record)
+            ok, value, record["duration_seconds"] = _timed(call)
+            record["status"] = "success" if ok else "failed"
+            if ok:
+                latency_tracker.record(key, record["duration_seconds"])
+                return value
+            record["error"] = str(value)
+            error = value
+        else:
+            try:
+                return _run_attempt(call, policy, key, attempt, timeout, attempts)
+            except Exception as e:
+                error = e
+
+        if attempt >= policy.max_attempts or not policy.is_transient(error):
+            raise error
+        delay = policy.backoff(attempt, random.random())
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            raise error
+        time.sleep(delay)
@@ -1,21 +1,56 @@
-from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
-from langsmith import traceable
-
-
-@traceable(name="default_node_ai_function")
-def default_node_ai_function(prompt_template: str, inputs: dict) -> dict:
-    llm = ChatOpenAI(model="gpt-4", temperature=0.2)
-    prompt = PromptTemplate(
-        template=prompt_template,
-        input_variables=list(inputs.keys())
-    )
-    chain = prompt | llm
-    result = chain.invoke(
-        inputs,
-        config={
-            "tags": ["pipeline", "node"],
-            "run_name": "pipeline-node"
-        }
-    )
-    return {"result": result.content}
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, Callable, Dict, Union
+
+DEFAULT_FUNCTION = "default_node_ai_function"
+
+# Implementations are referenced as "module:attribute" and only imported on
+# first use, so loading the flow models does not pull in LangChain.
+_registry: Dict[str, Union[str, Callable[..., Any]]] = {
+    DEFAULT_FUNCTION: "pipeline.functions.llm:default_node_ai_function",
+}
+
+
+def register_function(
+    name: str, implementation: Union[str, Callable[..., Any]]
+) -> None:
+    _registry[name] = implementation
+
+
+def get_function(name: str) -> Callable[..., Any]:
+    try:
+        implementation = _registry[name]
+    except KeyError:
+        raise ValueError(f"Função '{name}' não registrada")
+    if isinstance(implementation, str):
+        module_name, _, attribute = implementation.partition(":")
+        implementation = getattr(import_module(module_name), attribute)
+        _registry[name] = implementation
+    return implementation
+
+
+def call_function(name: str, **kwargs) -> Any:
+    return get_function(name)(**kwargs)
+
+
+@lru_cache(maxsize=None)
+def bind_function(name: str) -> Callable[..., Any]:
+    """Implementation for node functions called ``name``.
+
+    The registry is consulted on every call, so functions registered after
+    a flow was loaded are still picked up. Names that are not registered
+    run the default LLM prompt function. The same callable is returned for
+    the same name, which lets the planner recognise identical nodes.
+    """
+    def implementation(**kwargs):
+        # The default function takes a prompt template, not node inputs.
+        if name in _registry and name != DEFAULT_FUNCTION:
+            return call_function(name, **kwargs)
+        return call_function(
+            DEFAULT_FUNCTION,
+            prompt_template=kwargs.get("prompt", ""),
+            inputs=kwargs,
+        )
+
+    implementation.__name__ = name
+    return implementation
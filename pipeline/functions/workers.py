@@ -0,0 +1,404 @@
+"""
+Pool of pre-forked worker processes for running user-registered function code.
+
+Registered code is loaded by a worker the first time it runs it; each call then runs under its own
+time, CPU and memory limits. Workers are recycled after a fixed number of
+calls, and payloads above a size threshold travel through shared memory
+instead of the pipe.
+"""
+
+import math
+import multiprocessing
+import pickle
+import queue
+import resource
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ..models.nodes import FunctionDefinition, SupportedLanguages
+
+
+# Times registered code may time out or take its worker down while loading
+# before the function is considered broken.
+MAX_LOAD_FAILURES = 2
+
+
+class WorkerLimits(BaseModel):
+    """Per-call limits applied inside the worker process."""
+    timeout_seconds: Optional[float] = 30.0
+    cpu_seconds: Optional[int] = None
+    memory_bytes: Optional[int] = None
+
+
+class WorkerCallError(RuntimeError):
+    """Raised when registered code fails or its worker dies during a call."""
+
+
+class _WorkerLost(WorkerCallError):
+    """The worker process died and cannot be reused."""
+
+
+def _dump(value: Any, threshold: int) -> Tuple:
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) < threshold:
+        return ("inline", data)
+    shm = SharedMemory(create=True, size=len(data))
+    shm.buf[:len(data)] = data
+    shm.close()
+    return ("shm", shm.name, len(data))
+
+
+def _load(ref: Tuple) -> Any:
+    if ref[0] == "inline":
+        return pickle.loads(ref[1])
+    _, name, size = ref
+    shm = SharedMemory(name=name)
+    try:
+        return pickle.loads(bytes(shm.buf[:size]))
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _discard(ref: Tuple) -> None:
+    if ref[0] == "shm":
+        try:
+            shm = SharedMemory(name=ref[1])
+        except FileNotFoundError:
+            return
+        shm.close()
+        shm.unlink()
+
+
+def _set_soft_limit(limit: int, value: Optional[int]) -> None:
+    _, hard = resource.getrlimit(limit)
+    if value is None or (hard != resource.RLIM_INFINITY and value > hard):
+        value = hard
+    resource.setrlimit(limit, (value, hard))
+
+
+def _apply_limits(limits: WorkerLimits) -> None:
+    if limits.cpu_seconds is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = math.ceil(usage.ru_utime + usage.ru_stime)
+        _set_soft_limit(resource.RLIMIT_CPU, used + limits.cpu_seconds)
+    if limits.memory_bytes is not None:
+        _set_soft_limit(resource.RLIMIT_AS, limits.memory_bytes)
+
+
+def _reset_limits() -> None:
+    _set_soft_limit(resource.RLIMIT_CPU, None)
+    _set_soft_limit(resource.RLIMIT_AS, None)
+
+
+def _worker_main(conn: Connection, shm_threshold: int) -> None:
+    functions: Dict[str, Callable[..., Any]] = {}
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        kind = message[0]
+        if kind == "stop":
+            return
+        if kind == "load":
+            _, name, code, entrypoint, limits = message
+            namespace: Dict[str, Any] = {"__name__": f"registered_{name}"}
+            try:
+                _apply_limits(limits)
+                try:
+                    exec(compile(code, f"<function {name}>", "exec"), namespace)
+                finally:
+                    _reset_limits()
+                functions[name] = namespace[entrypoint]
+            except BaseException as e:
+                functions.pop(name, None)
+                conn.send(("error", type(e).__name__, str(e)))
+            else:
+                conn.send(("ok", None))
+            continue
+
+        _, name, ref, limits = message
+        try:
+            kwargs = _load(ref)
+            _apply_limits(limits)
+            try:
+                result = functions[name](**kwargs)
+            finally:
+                _reset_limits()
+            conn.send(("ok", _dump(result, shm_threshold)))
+        except BaseException as e:
+            conn.send(("error", type(e).__name__, str(e)))
+
+
+class _Worker:
+    def __init__(self, context, shm_threshold: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, shm_threshold), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.calls = 0
+        self.loaded: set[str] = set()
+
+    def request(self, message: Tuple, timeout: Optional[float]) -> Tuple:
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            raise TimeoutError
+        return self.conn.recv()
+
+    def stop(self, graceful: bool = True) -> None:
+        if graceful:
+            try:
+                self.conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Pre-forked pool of isolated Python workers for registered function code.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        max_calls_per_worker: int = 100,
+        shm_threshold: int = 1 << 20,
+        default_limits: Optional[WorkerLimits] = None,
+        start_method: str = "forkserver",
+    ):
+        """
+        Start the pool's worker processes.
+
+        Args:
+            size: Number of worker processes kept alive
+            max_calls_per_worker: Calls after which a worker is replaced
+            shm_threshold: Pickled payload size (bytes) above which inputs
+                and outputs are passed through shared memory
+            default_limits: Limits used when a call does not provide its own
+            start_method: multiprocessing start method for the workers
+        """
+        self.max_calls_per_worker = max_calls_per_worker
+        self.shm_threshold = shm_threshold
+        self.default_limits = default_limits or WorkerLimits()
+        self._context = multiprocessing.get_context(start_method)
+        self._code: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: list[_Worker] = []
+        # Functions whose code failed to load, with the reason, and how often
+        # loading timed out or killed a worker. Cleared on re-registration.
+        self._broken: Dict[str, str] = {}
+        self._load_failures: Dict[str, int] = {}
+        self._missing = 0
+        self._closed = False
+        # Workers must share the parent's tracker: shared memory created on
+        # one side of the pipe is unlinked on the other.
+        resource_tracker.ensure_running()
+        for _ in range(size):
+            self._release(self._spawn())
+
+    def register(self, name: str, code: str, entrypoint: Optional[str] = None):
+        """
+        Register Python source code whose ``entrypoint`` (defaults to
+        ``name``) is called with the node inputs as keyword arguments.
+        """
+        compile(code, f"<function {name}>", "exec")
+        with self._lock:
+            self._code[name] = (code, entrypoint or name)
+            self._broken.pop(name, None)
+            self._load_failures.pop(name, None)
+            workers = list(self._workers)
+        for worker in workers:
+            worker.loaded.discard(name)
+
+    def register_definition(
+        self, definition: FunctionDefinition
+    ) -> FunctionDefinition:
+        """
+        Register ``definition.code`` and return a copy of the definition
+        whose implementation runs inside the pool.
+        """
+        if definition.code_language != SupportedLanguages.PYTHON:
+            raise ValueError(
+                f"Linguagem '{definition.code_language}' não suportada pelo pool")
+        if not definition.code:
+            raise ValueError(f"Função '{definition.name}' não possui código")
+        self.register(definition.name, definition.code)
+        return definition.model_copy(
+            update={"implementation": self.bind(definition.name)}
+        )
+
+    def bind(
+        self, name: str, limits: Optional[WorkerLimits] = None
+    ) -> Callable[..., Any]:
+        def implementation(**kwargs):
+            return self.call(name, limits=limits, **kwargs)
+
+        implementation.__name__ = name
+        return implementation
+
+    def call(
+        self, name: str, limits: Optional[WorkerLimits] = None, **kwargs
+    ) -> Any:
+        if name not in self._code:
+            raise ValueError(f"Função '{name}' não registrada no pool")
+        if name in self._broken:
+            raise WorkerCallError(self._broken[name])
+        limits = limits or self.default_limits
+        while True:
+            worker = self._acquire()
+            healthy = False
+            try:
+                try:
+                    self._ensure_loaded(worker, name, limits)
+                except _WorkerLost:
+                    if name in self._broken:
+                        raise
+                    # Retry on another worker; this one is replaced below.
+                    continue
+                ref = _dump(kwargs, self.shm_threshold)
+                worker.calls += 1
+                try:
+                    response = worker.request(
+                        ("call", name, ref, limits), limits.timeout_seconds
+                    )
+                except TimeoutError:
+                    _discard(ref)
+                    raise TimeoutError(
+                        f"Função '{name}' excedeu {limits.timeout_seconds}s")
+                except (EOFError, OSError) as e:
+                    _discard(ref)
+                    raise WorkerCallError(
+                        f"Worker da função '{name}' foi encerrado: {e}")
+                healthy = True
+                if response[0] == "error":
+                    raise WorkerCallError(f"{response[1]}: {response[2]}")
+                return _load(response[1])
+            finally:
+                if healthy and worker.calls < self.max_calls_per_worker:
+                    self._release(worker)
+                else:
+                    self._replace(worker, graceful=healthy)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _spawn(self) -> _Worker:
+        # Code is loaded on first use by _ensure_loaded, so a new worker is
+        # ready as soon as its process has started.
+        worker = _Worker(self._context, self.shm_threshold)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _ensure_loaded(
+        self, worker: _Worker, name: str, limits: WorkerLimits
+    ) -> None:
+        if name in worker.loaded:
+            return
+        code, entrypoint = self._code[name]
+        try:
+            response = worker.request(
+                ("load", name, code, entrypoint, limits), limits.timeout_seconds
+            )
+        except TimeoutError:
+            message = (
+                f"Carregamento da função '{name}' excedeu {limits.timeout_seconds}s")
+            self._record_load_failure(name, message)
+            raise TimeoutError(message)
+        except (EOFError, OSError) as e:
+            message = f"Worker encerrado ao carregar '{name}': {e}"
+            self._record_load_failure(name, message)
+            raise _WorkerLost(message)
+        if response[0] == "error":
+            with self._lock:
+                self._broken[name] = f"{response[1]}: {response[2]}"
+            raise WorkerCallError(self._broken[name])
+        with self._lock:
+            self._load_failures.pop(name, None)
+        worker.loaded.add(name)
+
+    def _record_load_failure(self, name: str, message: str) -> None:
+        # A single lost worker may have died for unrelated reasons (OOM
+        # killer, failed start); only repeated failures blame the code.
+        with self._lock:
+            failures = self._load_failures.get(name, 0) + 1
+            self._load_failures[name] = failures
+            if failures >= MAX_LOAD_FAILURES:
+                self._broken[name] = message
+
+    def _acquire(self) -> _Worker:
+        while True:
+            if self._closed:
+                raise RuntimeError("WorkerPool encerrado")
+            with self._lock:
+                respawn = self._missing > 0 and self._idle.empty()
+                if respawn:
+                    self._missing -= 1
+            if respawn:
+                try:
+                    return self._spawn()
+                except Exception:
+                    with self._lock:
+                        self._missing += 1
+                    raise
+            worker = self._idle.get()
+            if worker.process.is_alive():
+                return worker
+            # Died while idle: not the fault of any function.
+            self._replace(worker, graceful=False)
+
+    def _release(self, worker: _Worker) -> None:
+        self._idle.put(worker)
+
+    def _retire(self, worker: _Worker, graceful: bool = True) -> None:
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        worker.stop(graceful)
+
+    def _replace(self, worker: _Worker, graceful: bool = True) -> None:
+        # Stopping and starting processes happens off the caller's thread, so
+        # recycling or a timeout never delays the call that triggered it.
+        threading.Thread(
+            target=self._respawn, args=(worker, graceful), daemon=True
+        ).start()
+
+    def _respawn(self, worker: _Worker, graceful: bool) -> None:
+        self._retire(worker, graceful)
+        if self._closed:
+            return
+        try:
+            replacement = self._spawn()
+        except Exception:
+            # The next _acquire retries the spawn instead of waiting forever.
+            with self._lock:
+                self._missing += 1
+            return
+        if self._closed:
+            self._retire(replacement)
+        else:
+            self._release(replacement)
@@ -1,8 +1,10 @@
 from .flow import Flow
 from .nodes import Node, FunctionDefinition, Edge
 from .parameters import Parameter
+from .policies import ExecutionPolicy
 from .transformations import (
     TransformationProtocol,
+    TransformationDefinition,
     CustomTransformationDefinition,
     DefaultTransformationDefinition,
 )
@@ -1,4 +1,5 @@
 from collections import defaultdict, deque
+from typing import Iterable
 
 from pydantic import BaseModel
 
@@ -29,11 +30,11 @@ class Flow(BaseModel):
     def get_execution_order(self) -> list[str]:
         adjacency = defaultdict(list)
         indegree = defaultdict(int)
+        for node in self.nodes:
+            indegree[node.id] = 0
         for edge in self.edges:
             adjacency[edge.from_node].append(edge.to_node)
             indegree[edge.to_node] += 1
-            if edge.from_node not in indegree:
-                indegree[edge.from_node] = 0
         queue = deque([nid for nid, deg in indegree.items() if deg == 0])
         order = []
         while queue:
@@ -46,3 +47,28 @@ class Flow(BaseModel):
         if len(order) != len(self.nodes):
             raise ValueError("Ciclo detectado no fluxo")
         return order
+
+    def get_required_nodes(self, requested_outputs: Iterable[str]) -> set[str]:
+        node_map = {node.id: node for node in self.nodes}
+        pending = []
+        for key in requested_outputs:
+            node_id, _, output = key.partition(".")
+            if node_id not in node_map:
+                raise ValueError(f"Nó '{node_id}' da saída '{key}' não encontrado")
+            if output not in [o.name for o in node_map[node_id].outputs]:
+                raise ValueError(
+                    f"Saída '{output}' não encontrada no nó '{node_id}'")
+            pending.append(node_id)
+
+        incoming = defaultdict(list)
+        for edge in self.edges:
+            incoming[edge.to_node].append(edge.from_node)
+
+        required = set()
+        while pending:
+            node_id = pending.pop()
+            if node_id in required:
+                continue
+            required.add(node_id)
+            pending.extend(incoming[node_id])
+        return required
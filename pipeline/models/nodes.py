@@ -1,11 +1,13 @@
-from typing import Optional, Callable
+from enum import StrEnum
+from typing import Any, Optional, Callable
 
 from pydantic import BaseModel
-from pydantic import Field
+from pydantic import Field, model_validator
 
 from .parameters import Parameter
-from .transformations import TransformationProtocol, DefaultTransformationDefinition
-from ..functions import default_node_ai_function
+from .policies import ExecutionPolicy
+from .transformations import TransformationDefinition, DefaultTransformationDefinition
+from ..functions import bind_function
 
 class SupportedLanguages(StrEnum):
     PYTHON = "python"
@@ -15,30 +17,52 @@ class SupportedLanguages(StrEnum):
 class FunctionDefinition(BaseModel):
     name: str
     description: Optional[str] = None
-    inputs: list[Parameter]
-    outputs: list[Parameter]
+    inputs: list[Parameter] = []
+    outputs: list[Parameter] = []
     code_language: SupportedLanguages = SupportedLanguages.PYTHON
-    implementation: Callable[..., any] = lambda **kwargs: default_node_ai_function(
-        prompt_template=kwargs.get("prompt", ""), inputs=kwargs
-    )
+    code: Optional[str] = None
+    policy: Optional[ExecutionPolicy] = None
+    implementation: Optional[Callable[..., Any]] = None
+
+    @model_validator(mode="after")
+    def resolve_implementation(self) -> "FunctionDefinition":
+        # Definitions loaded from JSON carry no callable; they resolve to the
+        # function registered under their name.
+        if self.implementation is None:
+            self.implementation = bind_function(self.name)
+        return self
 
 
 class Node(BaseModel):
     id: str
     name: str
+    inputs: list[Parameter] = []
+    outputs: list[Parameter] = []
+    policy: Optional[ExecutionPolicy] = None
     function: Optional[FunctionDefinition] = Field(
         default_factory=lambda: FunctionDefinition(
             name="DefaultLLMPromptExecutor",
             description="Execute a default prompt with LangChain"
         ))
 
+    @model_validator(mode="after")
+    def check_policy(self) -> "Node":
+        # Nodes without inputs/outputs mutate the pipeline directly; a hedged
+        # or timed-out call would keep doing so after the node has finished.
+        policy = self.policy or (self.function and self.function.policy)
+        if policy and policy.is_supervised and not self.inputs and not self.outputs:
+            raise ValueError(
+                f"Nó '{self.id}' sem entradas/saídas não aceita timeout, "
+                "prazo ou hedging")
+        return self
+
 
-class Edge(BaseModel, TransformationProtocol):
+class Edge(BaseModel):
     from_node: str
     from_output: str
     to_node: str
     to_input: str
-    transformation: TransformationProtocol = Field(
+    transformation: TransformationDefinition = Field(
         default_factory=DefaultTransformationDefinition
     )
 
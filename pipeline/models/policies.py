@@ -0,0 +1,56 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+# Exception class names treated as transient regardless of their module, so
+# provider SDK errors can be classified without importing the SDKs.
+TRANSIENT_ERROR_NAMES = {
+    "TimeoutError",
+    "ConnectionError",
+    "APITimeoutError",
+    "APIConnectionError",
+    "RateLimitError",
+    "InternalServerError",
+    "ServiceUnavailableError",
+}
+
+TRANSIENT_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class ExecutionPolicy(BaseModel):
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
+    attempt_timeout_seconds: Optional[float] = Field(default=None, gt=0)
+    max_attempts: int = Field(default=1, ge=1)
+    backoff_base_seconds: float = Field(default=0.5, ge=0)
+    backoff_max_seconds: float = Field(default=30.0, ge=0)
+    jitter: float = Field(default=0.5, ge=0, le=1)
+    retry_on: list[str] = []
+    hedge: bool = False
+    hedge_quantile: float = Field(default=0.95, gt=0, le=1)
+    hedge_min_samples: int = Field(default=20, ge=1)
+    hedge_delay_seconds: Optional[float] = Field(default=None, ge=0)
+
+    @property
+    def is_supervised(self) -> bool:
+        """Whether calls run on helper threads that may outlive the node."""
+        return (
+            self.hedge
+            or self.deadline_seconds is not None
+            or self.attempt_timeout_seconds is not None
+        )
+
+    def is_transient(self, error: BaseException) -> bool:
+        names = TRANSIENT_ERROR_NAMES | set(self.retry_on)
+        if any(cls.__name__ in names for cls in type(error).__mro__):
+            return True
+        status_code = getattr(error, "status_code", None)
+        if status_code is None:
+            status_code = getattr(getattr(error, "response", None), "status_code", None)
+        return status_code in TRANSIENT_STATUS_CODES
+
+    def backoff(self, attempt: int, rand: float) -> float:
+        delay = min(
+            self.backoff_max_seconds,
+            self.backoff_base_seconds * 2 ** (attempt - 1),
+        )
+        return delay * (1 - self.jitter * rand)
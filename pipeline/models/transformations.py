@@ -1,7 +1,6 @@
-from typing import Any, Literal, Union, Protocol
+from typing import Annotated, Any, Literal, Union, Protocol
 
-import requests
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class TransformationProtocol(Protocol):
@@ -9,19 +8,21 @@ class TransformationProtocol(Protocol):
         ...
 
 
-class DefaultTransformationDefinition(BaseModel, TransformationProtocol):
+class DefaultTransformationDefinition(BaseModel):
     type: Literal["default"] = "default"
 
     def apply(self, value: Any) -> Any:
         return value
 
 
-class CustomTransformationDefinition(BaseModel, TransformationProtocol):
+class CustomTransformationDefinition(BaseModel):
     type: Literal["custom"] = "custom"
     language: Literal["python", "javascript", "go"]
     code: str
 
     def apply(self, value: Any) -> Any:
+        import requests
+
         try:
             response = requests.post(
                 url=f"http://executor-{self.language}:8000/transform",
@@ -32,3 +33,9 @@ class CustomTransformationDefinition(BaseModel, TransformationProtocol):
             return response.json().get("result")
         except Exception as e:
             raise RuntimeError(f"Erro ao aplicar transformação customizada: {str(e)}")
+
+
+TransformationDefinition = Annotated[
+    Union[DefaultTransformationDefinition, CustomTransformationDefinition],
+    Field(discriminator="type"),
+]
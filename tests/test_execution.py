@@ -0,0 +1,141 @@
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from pipeline.execution import LatencyTracker, execute_with_policy, latency_tracker
+from pipeline.models import ExecutionPolicy, FunctionDefinition, Node, Parameter
+
+
+def _flaky(failures, error=ConnectionError):
+    calls = {"count": 0}
+
+    def call():
+        calls["count"] += 1
+        if calls["count"] <= failures:
+            raise error("boom")
+        return calls["count"]
+
+    return call
+
+
+def test_retries_transient_errors():
+    attempts = []
+    policy = ExecutionPolicy(max_attempts=3, backoff_base_seconds=0.01)
+    assert execute_with_policy(_flaky(2), policy, "retry", attempts) == 3
+    assert [a["status"] for a in attempts] == ["failed", "failed", "success"]
+    assert [a["attempt"] for a in attempts] == [1, 2, 3]
+
+
+def test_does_not_retry_permanent_errors():
+    attempts = []
+    policy = ExecutionPolicy(max_attempts=3, backoff_base_seconds=0.01)
+    with pytest.raises(ValueError):
+        execute_with_policy(_flaky(1, ValueError), policy, "permanent", attempts)
+    assert len(attempts) == 1
+
+
+def test_retry_on_extends_transient_errors():
+    policy = ExecutionPolicy(
+        max_attempts=2, backoff_base_seconds=0.01, retry_on=["ValueError"]
+    )
+    assert execute_with_policy(_flaky(1, ValueError), policy, "retry_on") == 2
+
+
+def test_gives_up_after_max_attempts():
+    attempts = []
+    policy = ExecutionPolicy(max_attempts=2, backoff_base_seconds=0.01)
+    with pytest.raises(ConnectionError):
+        execute_with_policy(_flaky(5), policy, "exhausted", attempts)
+    assert len(attempts) == 2
+
+
+def test_attempt_timeout():
+    attempts = []
+    policy = ExecutionPolicy(attempt_timeout_seconds=0.1)
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        execute_with_policy(lambda: time.sleep(2), policy, "timeout", attempts)
+    assert time.monotonic() - started < 1
+    assert [a["status"] for a in attempts] == ["timeout"]
+
+
+def test_deadline_bounds_retries():
+    attempts = []
+    policy = ExecutionPolicy(
+        deadline_seconds=0.3, attempt_timeout_seconds=0.2,
+        max_attempts=10, backoff_base_seconds=0.01,
+    )
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        execute_with_policy(lambda: time.sleep(2), policy, "deadline", attempts)
+    assert time.monotonic() - started < 1
+    assert 1 < len(attempts) < 10
+
+
+def test_hedge_wins_over_slow_call():
+    for _ in range(20):
+        latency_tracker.record("hedge", 0.02)
+    calls = {"count": 0}
+
+    def call():
+        calls["count"] += 1
+        time.sleep(2 if calls["count"] == 1 else 0.01)
+        return calls["count"]
+
+    attempts = []
+    started = time.monotonic()
+    assert execute_with_policy(call, ExecutionPolicy(hedge=True), "hedge", attempts) == 2
+    assert time.monotonic() - started < 1
+    assert [(a["hedged"], a["status"]) for a in attempts] == [
+        (False, "abandoned"), (True, "success")
+    ]
+
+
+def test_no_hedge_without_latency_samples():
+    attempts = []
+    policy = ExecutionPolicy(hedge=True)
+    assert execute_with_policy(lambda: time.sleep(0.1) or 1, policy, "cold", attempts) == 1
+    assert len(attempts) == 1
+
+
+def test_latency_quantile():
+    tracker = LatencyTracker()
+    for duration in range(1, 101):
+        tracker.record("k", duration)
+    assert tracker.quantile("k", 0.95) == 95
+    assert tracker.quantile("k", 0.95, min_samples=200) is None
+    assert tracker.quantile("other", 0.95) is None
+
+
+@pytest.mark.parametrize("field, value", [
+    ("max_attempts", 0),
+    ("jitter", 1.5),
+    ("hedge_quantile", 5),
+    ("attempt_timeout_seconds", 0),
+    ("backoff_base_seconds", -1),
+])
+def test_policy_rejects_invalid_values(field, value):
+    with pytest.raises(ValidationError):
+        ExecutionPolicy(**{field: value})
+
+
+def test_backoff_is_never_negative():
+    policy = ExecutionPolicy(jitter=1)
+    assert policy.backoff(1, 1.0) == 0
+    assert policy.backoff(10, 0.0) == policy.backoff_max_seconds
+
+
+def test_side_effect_nodes_reject_supervised_policies():
+    with pytest.raises(ValidationError):
+        Node(id="n", name="n", policy=ExecutionPolicy(hedge=True))
+    with pytest.raises(ValidationError):
+        Node(id="n", name="n", function=FunctionDefinition(
+            name="f", policy=ExecutionPolicy(attempt_timeout_seconds=1),
+        ))
+    Node(id="n", name="n", policy=ExecutionPolicy(max_attempts=3))
+    Node(
+        id="n", name="n",
+        outputs=[Parameter(name="out", type="str")],
+        policy=ExecutionPolicy(hedge=True),
+    )
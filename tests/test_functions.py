@@ -0,0 +1,63 @@
+import pytest
+
+from pipeline import functions
+from pipeline.functions import (
+    DEFAULT_FUNCTION, bind_function, get_function, register_function,
+)
+from pipeline.models import Flow, FunctionDefinition
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setattr(functions, "_registry", dict(functions._registry))
+
+
+def test_definitions_resolve_registered_functions_by_name():
+    register_function("double", lambda x: {"y": x * 2})
+    definition = FunctionDefinition(name="double")
+    assert definition.implementation(x=21) == {"y": 42}
+
+
+def test_functions_registered_after_loading_are_picked_up():
+    flow = Flow.model_validate({"nodes": [
+        {"id": "n", "name": "n", "function": {"name": "late"}},
+    ]})
+    register_function("late", lambda: {"ok": True})
+    assert flow.nodes[0].function.implementation() == {"ok": True}
+
+
+def test_string_references_are_imported_on_first_use():
+    register_function("dumps", "json:dumps")
+    assert get_function("dumps")([1]) == "[1]"
+
+
+def test_unregistered_names_run_the_default_function():
+    calls = []
+    register_function(
+        DEFAULT_FUNCTION,
+        lambda prompt_template, inputs: calls.append((prompt_template, inputs)),
+    )
+    FunctionDefinition(name="unknown").implementation(prompt="Hi {name}", name="x")
+    assert calls == [("Hi {name}", {"prompt": "Hi {name}", "name": "x"})]
+
+
+def test_same_name_binds_the_same_implementation():
+    assert bind_function("a") is bind_function("a")
+    assert (
+        FunctionDefinition(name="a").implementation
+        is FunctionDefinition(name="a").implementation
+    )
+
+
+def test_explicit_implementations_are_kept():
+    def implementation(**kwargs):
+        return kwargs
+
+    assert FunctionDefinition(
+        name="a", implementation=implementation
+    ).implementation is implementation
+
+
+def test_get_function_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        get_function("missing")
@@ -0,0 +1,43 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Wall-clock budget for importing the flow models in a fresh interpreter.
+IMPORT_BUDGET_SECONDS = 1.5
+
+HEAVY_MODULES = ("langchain", "langsmith", "requests")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import pipeline.models
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def _import_models():
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout)
+
+
+def test_models_import_without_heavy_dependencies():
+    modules = _import_models()["modules"]
+    loaded = [
+        name for name in modules
+        if name.split(".")[0].startswith(HEAVY_MODULES)
+    ]
+    assert loaded == []
+
+
+def test_models_import_within_budget():
+    assert _import_models()["elapsed"] < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,98 @@
+import asyncio
+import copy
+import threading
+from datetime import datetime
+
+import pytest
+
+from pipeline import Pipeline, PipelineStatus
+from pipeline.models import Flow, Node, Parameter
+
+
+@pytest.fixture
+def pipeline():
+    flow = Flow(nodes=[
+        Node(id="a", name="a", inputs=[Parameter(name="x", type="str")]),
+        Node(id="b", name="b"),
+    ])
+    return Pipeline(id="p", flow=flow, started_at=datetime.utcnow())
+
+
+def test_versions_increase_with_every_change(pipeline):
+    pipeline.update_node_status("a", PipelineStatus.RUNNING)
+    pipeline.inject_user_input("a.x", "value")
+    pipeline.pause()
+    assert pipeline.version == 3
+    assert pipeline.export_status()["version"] == 3
+
+
+def test_export_changes_only_returns_newer_records(pipeline):
+    pipeline.update_node_status("a", PipelineStatus.RUNNING)
+    since = pipeline.version
+    pipeline.update_node_status("b", PipelineStatus.SUCCESS)
+
+    changes = pipeline.export_changes(since)
+    assert changes["version"] == pipeline.version
+    assert list(changes["executed_nodes"]) == ["b"]
+    assert "status" not in changes and "user_inputs" not in changes
+    assert pipeline.export_changes(pipeline.version)["executed_nodes"] == {}
+
+
+def test_export_changes_includes_user_inputs_and_status(pipeline):
+    assert "user_inputs" not in pipeline.export_changes()
+    pipeline.inject_user_input("a.x", "value")
+    changes = pipeline.export_changes()
+    assert changes["user_inputs"] == {"a.x": "value"}
+    assert changes["required_user_inputs"] == ["a.x"]
+
+    since = pipeline.version
+    pipeline.finish(PipelineStatus.SUCCESS)
+    changes = pipeline.export_changes(since)
+    assert changes["status"] == PipelineStatus.SUCCESS
+    assert "user_inputs" not in changes
+
+
+def test_finish_rejects_non_final_status(pipeline):
+    with pytest.raises(ValueError):
+        pipeline.finish(PipelineStatus.RUNNING)
+
+
+def test_subscribe_pushes_changes_from_other_threads_and_ends(pipeline):
+    async def collect():
+        received = []
+        worker = None
+        async for changes in pipeline.subscribe():
+            received.append(changes)
+            if worker is None:
+                def run():
+                    pipeline.update_node_status("a", PipelineStatus.SUCCESS)
+                    pipeline.finish(PipelineStatus.SUCCESS)
+
+                worker = threading.Thread(target=run)
+                worker.start()
+        worker.join()
+        return received
+
+    pipeline.update_node_status("a", PipelineStatus.RUNNING)
+    received = asyncio.run(asyncio.wait_for(collect(), timeout=5))
+
+    assert received[0]["executed_nodes"]["a"]["status"] == PipelineStatus.RUNNING
+    assert received[-1]["status"] == PipelineStatus.SUCCESS
+    assert received[-1]["version"] == pipeline.version
+
+
+def test_subscribe_sse_frames_events(pipeline):
+    async def first_event():
+        async for event in pipeline.subscribe_sse():
+            return event
+
+    pipeline.update_node_status("a", PipelineStatus.RUNNING)
+    event = asyncio.run(first_event())
+    assert event.startswith("id: 1\nevent: changes\ndata: {")
+    assert event.endswith("\n\n")
+
+
+def test_copies_do_not_share_subscribers(pipeline):
+    for copied in (pipeline.model_copy(), pipeline.model_copy(deep=True),
+                   copy.copy(pipeline)):
+        assert copied._subscribers is not pipeline._subscribers
@@ -0,0 +1,155 @@
+from datetime import datetime
+
+import pytest
+
+from graph.planner import plan_flow
+from pipeline import Pipeline
+from pipeline.models import Edge, Flow, FunctionDefinition, Node, Parameter
+
+
+def _implementation(**kwargs):
+    return kwargs
+
+
+SUMMARIZE = FunctionDefinition(name="summarize", implementation=_implementation)
+
+
+def _node(node_id, inputs, outputs, function=None):
+    return Node(
+        id=node_id,
+        name=node_id,
+        inputs=[Parameter(name=n, type="str") for n in inputs],
+        outputs=[Parameter(name=n, type="str") for n in outputs],
+        function=function or FunctionDefinition(
+            name=node_id, implementation=_implementation
+        ),
+    )
+
+
+def _edge(from_node, from_output, to_node, to_input):
+    return Edge(
+        from_node=from_node, from_output=from_output,
+        to_node=to_node, to_input=to_input,
+    )
+
+
+@pytest.fixture
+def flow():
+    return Flow(
+        nodes=[
+            _node("load", ["path"], ["text"]),
+            _node("summary_a", ["text"], ["summary"], SUMMARIZE),
+            _node("summary_b", ["text"], ["summary"], SUMMARIZE),
+            _node("report", ["a", "b"], ["report"]),
+            _node("optional", ["text"], ["extra"]),
+        ],
+        edges=[
+            _edge("load", "text", "summary_a", "text"),
+            _edge("load", "text", "summary_b", "text"),
+            _edge("summary_a", "summary", "report", "a"),
+            _edge("summary_b", "summary", "report", "b"),
+            _edge("load", "text", "optional", "text"),
+        ],
+    )
+
+
+def test_prunes_nodes_not_needed_for_requested_outputs(flow):
+    plan = plan_flow(flow, ["report.report"], {"load.path": "main.py"})
+    node_ids = [node.id for node in plan.flow.nodes]
+    assert "optional" not in node_ids
+    assert "load" in node_ids and "report" in node_ids
+
+
+def test_merges_identical_nodes_and_rewires_edges(flow):
+    plan = plan_flow(flow, ["report.report"], {"load.path": "main.py"})
+    assert plan.aliases == {"summary_b": "summary_a"}
+    assert plan.aliases_of("summary_a") == ["summary_b"]
+    assert {
+        (e.from_node, e.to_node, e.to_input) for e in plan.flow.edges
+    } == {
+        ("load", "summary_a", "text"),
+        ("summary_a", "report", "a"),
+        ("summary_a", "report", "b"),
+    }
+
+
+def test_keeps_every_node_without_requested_outputs(flow):
+    plan = plan_flow(flow, None, {"load.path": "main.py"})
+    assert {node.id for node in plan.flow.nodes} == {
+        "load", "summary_a", "report", "optional"
+    }
+
+
+def test_does_not_merge_nodes_with_missing_user_inputs():
+    flow = Flow(nodes=[
+        _node("s", ["path"], ["summary"], SUMMARIZE),
+        _node("t", ["path"], ["summary"], SUMMARIZE),
+    ])
+    assert plan_flow(flow, None, {}).aliases == {}
+    assert plan_flow(flow, None, {"s.path": "a.py"}).aliases == {}
+    assert plan_flow(flow, None, {"s.path": "a.py", "t.path": "b.py"}).aliases == {}
+    assert plan_flow(
+        flow, None, {"s.path": "a.py", "t.path": "a.py"}
+    ).aliases == {"t": "s"}
+
+
+def test_does_not_merge_side_effect_nodes():
+    flow = Flow(nodes=[
+        _node("s", [], [], SUMMARIZE),
+        _node("t", [], [], SUMMARIZE),
+    ])
+    assert plan_flow(flow).aliases == {}
+
+
+def test_rejects_unknown_requested_outputs(flow):
+    with pytest.raises(ValueError):
+        plan_flow(flow, ["missing.report"])
+    with pytest.raises(ValueError):
+        plan_flow(flow, ["report.bogus"])
+
+
+def test_required_inputs_skip_pruned_nodes(flow):
+    flow.nodes.append(_node("standalone", ["question"], ["answer"]))
+    pipeline = Pipeline(id="p", flow=flow, started_at=datetime.utcnow())
+    assert pipeline.get_required_inputs() == ["load.path", "standalone.question"]
+
+    pipeline.requested_outputs = ["report.report"]
+    assert pipeline.get_required_inputs() == ["load.path"]
+
+
+def test_merge_is_rechecked_against_changed_user_inputs():
+    flow = Flow(nodes=[
+        _node("a", ["path"], ["out"], SUMMARIZE),
+        _node("b", ["path"], ["out"], SUMMARIZE),
+    ])
+    user_inputs = {"a.path": "x.py", "b.path": "x.py"}
+    plan = plan_flow(flow, None, user_inputs)
+    assert plan.aliases == {"b": "a"}
+    assert plan.merge_holds("b", user_inputs)
+
+    user_inputs["b.path"] = "y.py"
+    assert not plan.merge_holds("b", user_inputs)
+    user_inputs["b.path"] = "x.py"
+    user_inputs["a.path"] = "z.py"
+    assert not plan.merge_holds("b", user_inputs)
+
+
+def test_downstream_merges_depend_on_upstream_merge_inputs():
+    flow = Flow(
+        nodes=[
+            _node("a", ["path"], ["text"], SUMMARIZE),
+            _node("b", ["path"], ["text"], SUMMARIZE),
+            _node("c", ["text"], ["out"], SUMMARIZE),
+            _node("d", ["text"], ["out"], SUMMARIZE),
+        ],
+        edges=[
+            _edge("a", "text", "c", "text"),
+            _edge("b", "text", "d", "text"),
+        ],
+    )
+    user_inputs = {"a.path": "x.py", "b.path": "x.py"}
+    plan = plan_flow(flow, None, user_inputs)
+    assert plan.aliases == {"b": "a", "d": "c"}
+
+    user_inputs["b.path"] = "y.py"
+    assert not plan.merge_holds("d", user_inputs)
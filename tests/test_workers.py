@@ -0,0 +1,130 @@
+import os
+import time
+
+import pytest
+
+from pipeline.functions.workers import WorkerCallError, WorkerLimits, WorkerPool
+from pipeline.models import FunctionDefinition
+
+CODE = """
+import os
+import time
+
+def echo(**kwargs):
+    return {"pid": os.getpid(), **kwargs}
+
+def sleep(seconds):
+    time.sleep(seconds)
+
+def spin():
+    while True:
+        pass
+
+def fail():
+    raise KeyError("boom")
+"""
+
+HANGING_CODE = """
+while True:
+    pass
+"""
+
+# Takes its worker down on the first load only.
+FLAKY_CODE = """
+import os
+
+if not os.path.exists({marker!r}):
+    open({marker!r}, "w").close()
+    os._exit(1)
+
+def flaky():
+    return {{"ok": True}}
+"""
+
+
+def _shared_memory_segments():
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+@pytest.fixture
+def pool():
+    with WorkerPool(
+        size=2,
+        max_calls_per_worker=3,
+        shm_threshold=1024,
+        default_limits=WorkerLimits(timeout_seconds=5),
+    ) as pool:
+        for name in ("echo", "sleep", "spin", "fail"):
+            pool.register(name, CODE)
+        yield pool
+
+
+def test_call_returns_result(pool):
+    assert pool.call("echo", value=1)["value"] == 1
+
+
+def test_workers_are_recycled_after_max_calls(pool):
+    pids = [pool.call("echo")["pid"] for _ in range(7)]
+    assert all(pids.count(pid) <= 3 for pid in pids)
+    assert len(set(pids)) >= 3
+
+
+def test_large_payloads_go_through_shared_memory(pool):
+    before = _shared_memory_segments()
+    payload = b"x" * (4 * 1024 * 1024)
+    assert pool.call("echo", payload=payload)["payload"] == payload
+    assert _shared_memory_segments() == before
+
+
+def test_timeout_kills_the_worker(pool):
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool.call("sleep", limits=WorkerLimits(timeout_seconds=0.5), seconds=10)
+    # The worker is killed in the background, after the call has returned.
+    assert time.monotonic() - started < 1.5
+    assert pool.call("echo", value=2)["value"] == 2
+
+
+def test_cpu_limit_kills_the_worker(pool):
+    with pytest.raises(WorkerCallError):
+        pool.call("spin", limits=WorkerLimits(timeout_seconds=10, cpu_seconds=1))
+    assert pool.call("echo", value=3)["value"] == 3
+
+
+def test_errors_in_code_are_reported(pool):
+    with pytest.raises(WorkerCallError, match="KeyError"):
+        pool.call("fail")
+
+
+def test_hanging_module_code_is_marked_broken(pool):
+    pool.register("hang", HANGING_CODE, "missing")
+    limits = WorkerLimits(timeout_seconds=0.5)
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            pool.call("hang", limits=limits)
+    started = time.monotonic()
+    with pytest.raises(WorkerCallError):
+        pool.call("hang", limits=limits)
+    assert time.monotonic() - started < 0.5
+    assert pool.call("echo", value=4)["value"] == 4
+
+
+def test_worker_lost_while_loading_is_retried(pool, tmp_path):
+    pool.register("flaky", FLAKY_CODE.format(marker=str(tmp_path / "loaded")))
+    assert pool.call("flaky") == {"ok": True}
+
+
+def test_dead_idle_workers_are_replaced(pool):
+    for worker in list(pool._workers):
+        worker.process.kill()
+        worker.process.join()
+    assert pool.call("echo", value=5)["value"] == 5
+
+
+def test_register_definition_runs_in_pool(pool):
+    definition = pool.register_definition(FunctionDefinition(
+        name="double", code="def double(x):\n    return {'y': x * 2}",
+    ))
+    assert definition.implementation(x=21) == {"y": 42}
+    with pytest.raises(ValueError):
+        pool.register_definition(FunctionDefinition(name="no_code"))